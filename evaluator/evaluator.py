@@ -4,6 +4,8 @@ LangFuse evaluator for RAG response quality scoring.
 """
 
 import os
+
+import orjson
 from openai import OpenAI
 
 
@@ -76,3 +78,97 @@ Reasoning: [Brief explanation of the score]
             "clarity": True,
         },
     }
+
+
+def evaluate_rag_quality_batch(items: list, batch_size: int = 8) -> list:
+    """
+    Evaluates multiple RAG responses with one LLM call per batch,
+    amortizing the network round-trip across batch_size items.
+
+    Args:
+        items: dicts with "query", "response", and optional "context" keys
+
+    Returns:
+        list of dicts with score, reasoning, and metadata, in input order
+    """
+    results = []
+    for start in range(0, len(items), batch_size):
+        results.extend(_evaluate_batch(items[start : start + batch_size]))
+    return results
+
+
+def _evaluate_batch(batch: list) -> list:
+    """
+    Scores one batch of items in a single LLM call. Falls back to
+    per-item evaluation if the batched answer cannot be parsed.
+    """
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    numbered_items = []
+    for i, item in enumerate(batch, 1):
+        context = item.get("context")
+        entry = f"Item {i}:\nQuery: {item['query']}\n\nResponse: {item['response']}\n"
+        if context:
+            entry += f"\nRetrieved Context: {context[:500]}...\n"
+        numbered_items.append(entry)
+
+    evaluation_prompt = f"""You are an expert evaluator assessing the quality of RAG (Retrieval-Augmented Generation) responses.
+
+Evaluate each of the following {len(batch)} responses on a scale of 1-10 based on these criteria:
+- Relevance: Does it answer the query?
+- Accuracy: Is the information correct?
+- Completeness: Is it comprehensive?
+- Clarity: Is it well-structured and clear?
+- Context Usage: Does it properly use retrieved information?
+
+{chr(10).join(numbered_items)}
+
+Respond with a JSON array of exactly {len(batch)} objects, one per item in order, each of the form:
+{{"score": <1-10>, "reasoning": "<brief explanation of the score>"}}
+"""
+
+    completion = client.chat.completions.create(
+        model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        messages=[{"role": "user", "content": evaluation_prompt}],
+        temperature=0,
+        max_tokens=200 * len(batch),
+    )
+
+    eval_text = completion.choices[0].message.content
+
+    try:
+        # Tolerate code-fenced output
+        cleaned = eval_text.strip()
+        if cleaned.startswith("```"):
+            cleaned = cleaned.strip("`")
+            cleaned = cleaned[cleaned.index("[") :]
+        parsed = orjson.loads(cleaned[cleaned.index("[") : cleaned.rindex("]") + 1])
+        if len(parsed) != len(batch):
+            raise ValueError("score count mismatch")
+        # Validate entries inside the guarded region: non-dict entries or
+        # scores like "8/10" must also take the per-item fallback
+        results = [
+            {
+                "score": int(entry.get("score", 5)),
+                "reasoning": str(entry.get("reasoning", "")),
+                "criteria": {
+                    "relevance": True,
+                    "accuracy": True,
+                    "completeness": True,
+                    "clarity": True,
+                },
+            }
+            for entry in parsed
+        ]
+    except (ValueError, TypeError, AttributeError):
+        # Unparseable batch answer: score the items one by one
+        return [
+            evaluate_rag_quality(
+                query=item["query"],
+                response=item["response"],
+                context=item.get("context"),
+            )
+            for item in batch
+        ]
+
+    return results
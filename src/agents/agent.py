@@ -2,16 +2,69 @@
 Agent class for all agents.
 """
 
+import functools
 import os
 
+import numpy as np
+
 from dotenv import load_dotenv
 
+from langchain_community.embeddings import InfinityEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 
+from src.agents.local_index import load_dense_index
+
 load_dotenv()
 
 
+@functools.lru_cache(maxsize=4)
+def _get_embeddings(model_name: str):
+    """
+    Returns a process-wide embeddings instance for the given model name.
+
+    Loading the sentence-transformer is expensive (disk read + weight init),
+    so a single instance is shared by all agents for the process lifetime.
+    When INFINITY_API_URL is set, embedding is delegated to an Infinity
+    sidecar server, which batches concurrent requests dynamically.
+    """
+
+    infinity_url = os.getenv("INFINITY_API_URL")
+    if infinity_url:
+        return InfinityEmbeddings(model=model_name, infinity_api_url=infinity_url)
+
+    model_kwargs = {}
+    backend = os.getenv("EMBEDDING_BACKEND", "torch")
+    if backend != "torch":
+        # EMBEDDING_BACKEND=onnx runs the model through onnxruntime
+        # (requires optimum[onnxruntime]); EMBEDDING_MODEL_FILE can point
+        # at an int8-quantized export for ~2-4x CPU embed throughput
+        model_kwargs["backend"] = backend
+        model_file = os.getenv("EMBEDDING_MODEL_FILE")
+        if model_file:
+            model_kwargs["model_kwargs"] = {"file_name": model_file}
+    return HuggingFaceEmbeddings(model_name=model_name, model_kwargs=model_kwargs)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_vector_store(index_name: str, model_name: str):
+    """
+    Loads and caches the FAISS store for an agent so repeat queries reuse
+    the in-memory index instead of re-reading the .faiss/.pkl files.
+    """
+
+    index_dir = f"storage/vectors/{index_name}_index"
+    embeddings = _get_embeddings(model_name)
+    vector_store = FAISS.load_local(
+        index_dir, embeddings, allow_dangerous_deserialization=True
+    )
+    # HNSW indexes (built by src.build.index) need the search-time
+    # breadth set after load; Flat indexes have no hnsw attribute
+    if hasattr(vector_store.index, "hnsw"):
+        vector_store.index.hnsw.efSearch = 64
+    return vector_store
+
+
 class Agent:
     """
     Base class for all agents.
@@ -23,18 +76,35 @@ class Agent:
             self.name = name.value
         else:
             self.name = name
-        print(f"{self.name} is initializing")
+        if os.getenv("AGENT_DEBUG"):
+            print(f"{self.name} is initializing")
 
     def get_local_index(self):
         """
         Returns the local index for the agent.
         """
 
-        index_dir = f"storage/vectors/{self.name.lower()}_index"
-        embeddings = HuggingFaceEmbeddings(model_name=os.getenv("EMBEDDING_MODEL"))
-        return FAISS.load_local(
-            index_dir, embeddings, allow_dangerous_deserialization=True
-        )
+        return _load_vector_store(self.name.lower(), os.getenv("EMBEDDING_MODEL"))
+
+    def retrieve(self, query, k=3, query_vec=None):
+        """
+        Retrieves the top-k chunks for a query.
+
+        Corpora with an exported embedding matrix are served by the dense
+        brute-force top-k, which beats the FAISS pipeline at this scale;
+        otherwise the FAISS store is used. A precomputed query_vec skips
+        the embedding forward pass entirely.
+        """
+
+        if query_vec is None:
+            embeddings = _get_embeddings(os.getenv("EMBEDDING_MODEL"))
+            query_vec = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+
+        dense_index = load_dense_index(self.name.lower())
+        if dense_index is not None:
+            return dense_index.search(query_vec, k)
+
+        return self.get_local_index().similarity_search_by_vector(query_vec, k=k)
 
     def run(self):
         """
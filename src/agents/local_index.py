@@ -0,0 +1,100 @@
+"""
+Dense top-k retrieval over a persisted embedding matrix.
+
+For the small per-agent corpora in this project, a brute-force cosine
+top-k over an in-memory float32 matrix is cheaper than the full FAISS
+retriever pipeline. The scoring loop is Numba-JITted when numba is
+installed and falls back to NumPy matrix multiply otherwise.
+"""
+
+import functools
+import os
+import pickle
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _dot_scores(mat, query_vec):
+        n, d = mat.shape
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            s = np.float32(0.0)
+            for j in range(d):
+                s += mat[i, j] * query_vec[j]
+            out[i] = s
+        return out
+
+else:
+
+    def _dot_scores(mat, query_vec):
+        return mat @ query_vec
+
+
+class DenseIndex:
+    """
+    Brute-force cosine top-k index over row-normalized embeddings.
+    """
+
+    def __init__(self, matrix: np.ndarray, documents: list):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.documents = documents
+
+    def search(self, query_vec: np.ndarray, k: int = 3) -> list:
+        """
+        Returns the k documents most similar to the query vector.
+        """
+
+        query_vec = np.asarray(query_vec, dtype=np.float32)
+        norm = np.linalg.norm(query_vec)
+        if norm > 0:
+            query_vec = query_vec / norm
+
+        scores = _dot_scores(self.matrix, query_vec)
+        k = min(k, len(self.documents))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.documents[i] for i in top]
+
+
+def warmup(n: int = 256, d: int = 384, k: int = 3):
+    """
+    Runs the scoring kernel once on a representative (n, d) shape so the
+    Numba JIT specializes it ahead of the first real query. With
+    cache=True the compiled object persists under __pycache__, so after
+    one warmup run subsequent process starts load it instead of paying
+    the multi-second compile.
+    """
+
+    mat = np.zeros((n, d), dtype=np.float32)
+    query_vec = np.zeros(d, dtype=np.float32)
+    _dot_scores(mat, query_vec)
+
+
+@functools.lru_cache(maxsize=8)
+def load_dense_index(index_name: str):
+    """
+    Loads and caches the dense index for an agent, or returns None when
+    the embedding matrix has not been exported by src.build.index.
+    """
+
+    index_dir = f"storage/vectors/{index_name}_index"
+    matrix_path = os.path.join(index_dir, "embeddings.npy")
+    chunks_path = os.path.join(index_dir, "chunks.pkl")
+
+    if not (os.path.exists(matrix_path) and os.path.exists(chunks_path)):
+        return None
+
+    matrix = np.load(matrix_path)
+    with open(chunks_path, "rb") as f:
+        documents = pickle.load(f)
+    return DenseIndex(matrix, documents)
@@ -2,8 +2,13 @@
 Orchestrator class that classifies user queries into agent categories.
 """
 
+import functools
 import os
 import sys
+import threading
+
+import numpy as np
+
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.messages import HumanMessage
@@ -18,8 +23,10 @@ from langfuse.langchain import CallbackHandler
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from src.enums.agent_enums import AgentType
+from src.agents.agent import _get_embeddings
 from src.agents.finance_agent import FinanceAgent
 from src.agents.hr_agent import HRAgent
+from src.agents.semantic_cache import SemanticCache
 from src.agents.tech_agent import TechAgent
 
 load_dotenv()
@@ -27,6 +34,16 @@ load_dotenv()
 
 model_name = os.getenv("LLM_MODEL", "gpt-4")
 
+# Prompt templates are read and compiled once at import time so the hot
+# query path does no file I/O or template reparsing
+_PROMPTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "prompts")
+
+with open(os.path.join(_PROMPTS_DIR, "agent_prompt.txt"), "r") as _f:
+    _AGENT_PROMPT = ChatPromptTemplate.from_template(_f.read())
+
+with open(os.path.join(_PROMPTS_DIR, "orchestrator_prompt.txt"), "r") as _f:
+    _ORCHESTRATOR_PROMPT_TEXT = _f.read()
+
 # Import evaluator
 try:
     from evaluator.evaluator import evaluate_rag_quality
@@ -36,16 +53,64 @@ except ImportError:
     print("Warning: Evaluator not available")
     EVALUATOR_AVAILABLE = False
 
-# Agent mapping for tool creation
+# Agent singletons, instantiated once at import so per-query dispatch is
+# a dict lookup instead of object construction
 agents = {
-    AgentType.HR.value: HRAgent,
-    AgentType.TECH.value: TechAgent,
-    AgentType.FINANCE.value: FinanceAgent,
+    AgentType.HR.value: HRAgent(),
+    AgentType.TECH.value: TechAgent(),
+    AgentType.FINANCE.value: FinanceAgent(),
 }
 
+# Per-agent semantic caches so paraphrased queries skip the LLM round-trip
+_semantic_caches = {}
+_semantic_caches_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _get_llm(model: str, temperature: float, max_completion_tokens=None):
+    """
+    Returns a shared ChatOpenAI instance per (model, temperature,
+    max_completion_tokens) so the underlying HTTP connection pool and TLS
+    session are reused across calls instead of being rebuilt per query.
+    Tracing callbacks are supplied per-invoke via config.
+    """
+
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_completion_tokens=max_completion_tokens,
+    )
+
+
+def _embed_query_vec(query: str) -> np.ndarray:
+    """
+    Embeds a query into a single raw float32 vector. The router, semantic
+    cache and retrieval all reuse this one forward pass. The vector is
+    deliberately not normalized here: the FAISS stores rank under the L2
+    metric over raw document vectors, where scaling the query changes the
+    ranking, so cosine consumers (router, cache, dense index) each
+    normalize their own copy instead.
+    """
+
+    embeddings = _get_embeddings(os.getenv("EMBEDDING_MODEL"))
+    return np.asarray(embeddings.embed_query(query), dtype=np.float32)
+
+
+def _get_semantic_cache(agent: str) -> SemanticCache:
+    """
+    Returns the semantic response cache for an agent, creating it lazily.
+    """
+
+    with _semantic_caches_lock:
+        if agent not in _semantic_caches:
+            _semantic_caches[agent] = SemanticCache(
+                agent, _get_embeddings(os.getenv("EMBEDDING_MODEL"))
+            )
+        return _semantic_caches[agent]
+
 
 @observe(name="create_agent_qa_chain", capture_input=True, capture_output=True)
-def create_agent_qa_chain(agent: str, query: str, langfuse_handler=None):
+def create_agent_qa_chain(agent: str, query: str, langfuse_handler=None, query_vec=None):
     """
     Creates and runs a specific agent with the given query using LangChain 1.x Runnable pipeline.
 
@@ -57,50 +122,47 @@ def create_agent_qa_chain(agent: str, query: str, langfuse_handler=None):
     Returns:
         tuple: (response_text, retrieved_chunks_data) for logging to LangFuse
     """
-    agent_obj = agents[agent]()
+    agent_obj = agents[agent]
 
     try:
-        # Get the vector store and create retriever
-        vector_store = agent_obj.get_local_index()
-        retriever = vector_store.as_retriever(search_kwargs={"k": 3})
-
-        # Retrieve documents
-        retrieved_docs = retriever.invoke(query)
-
-        # Log retrieved chunks to console and prepare for LangFuse
+        # Check the semantic cache first: a near-duplicate of a previously
+        # answered query is served without retrieval or an LLM call
+        cache = _get_semantic_cache(agent)
+        cached_result = cache.get(query, query_vec=query_vec)
+        if cached_result is not None:
+            print(f"Semantic cache hit for {agent}")
+            return cached_result
+
+        # Retrieve documents (dense fast path or FAISS, see Agent.retrieve)
+        retrieved_docs = agent_obj.retrieve(query, k=3, query_vec=query_vec)
+
+        # Build the LangFuse chunk payload in one comprehension; the
+        # per-chunk console dump is debug-only since stdout writes block
         print(f"\nRetrieved {len(retrieved_docs)} chunks for {agent}:")
-        chunks_data = []
-        for i, doc in enumerate(retrieved_docs, 1):
-            print(f"  Chunk {i}: {doc.page_content[:100]}...")
-            chunks_data.append(
-                {"chunk_id": i, "content": doc.page_content, "metadata": doc.metadata}
-            )
+        chunks_data = [
+            {"chunk_id": i, "content": doc.page_content, "metadata": doc.metadata}
+            for i, doc in enumerate(retrieved_docs, 1)
+        ]
+        if os.getenv("AGENT_DEBUG"):
+            for i, doc in enumerate(retrieved_docs, 1):
+                print(f"  Chunk {i}: {doc.page_content[:100]}...")
         print()
 
-        # Create LLM with callback handler
-        # CallbackHandler automatically tracks: tokens, costs, latency, model, input, output, and other details
-        llm = ChatOpenAI(
-            model=model_name,
-            temperature=0,
-            max_completion_tokens=130,
-            callbacks=[langfuse_handler] if langfuse_handler else [],
-        )
+        # Shared LLM client; the CallbackHandler is passed per-invoke below
+        # and automatically tracks tokens, costs, latency and model details
+        llm = _get_llm(model_name, 0, 130)
 
-        # Load prompt template from file
-        prompt_path = os.path.join(
-            os.path.dirname(__file__), "..", "..", "prompts", "agent_prompt.txt"
-        )
-        with open(prompt_path, "r") as f:
-            prompt_template = f.read()
-        prompt = ChatPromptTemplate.from_template(prompt_template)
+        # Use the prompt template compiled at import time
+        prompt = _AGENT_PROMPT
 
         # Create the Runnable pipeline using LangChain 1.x API
+        # Join the retrieved chunks once; the map just forwards the string
+        context_str = "\n\n".join(doc.page_content for doc in retrieved_docs)
+
         qa_chain = (
             RunnableMap(
                 {
-                    "context": lambda x: "\n\n".join(
-                        [doc.page_content for doc in retrieved_docs]
-                    ),
+                    "context": lambda x: context_str,
                     "question": lambda x: x["question"],
                     "agent_type": lambda x: x["agent_type"],
                 }
@@ -118,13 +180,15 @@ def create_agent_qa_chain(agent: str, query: str, langfuse_handler=None):
         # Return response and chunks data
         # The @observe decorator will capture this return value
         # Chunks are included in the output for LangFuse tracking
-        return {
+        qa_result = {
             "response": result.content,
             "chunks": chunks_data,
             "num_chunks": len(chunks_data),
             "agent": agent,
             "model": model_name,
         }
+        cache.put(query, qa_result, query_vec=query_vec)
+        return qa_result
 
     except Exception as e:
         # Fallback to basic agent response if vector store fails
@@ -142,14 +206,109 @@ def create_agent_qa_chain(agent: str, query: str, langfuse_handler=None):
         }
 
 
+@observe(name="acreate_agent_qa_chain", capture_input=True, capture_output=True)
+async def acreate_agent_qa_chain(agent: str, query: str, langfuse_handler=None, query_vec=None):
+    """
+    Async variant of create_agent_qa_chain so independent agent calls can
+    overlap their network-bound retrieval and LLM latency via asyncio.gather.
+
+    Args:
+        agent (str): The name of the agent.
+        query (str): The query to be processed.
+        langfuse_handler: LangFuse callback handler for tracing.
+
+    Returns:
+        dict: response text plus retrieved chunks data for LangFuse logging
+    """
+    agent_obj = agents[agent]
+
+    try:
+        cache = _get_semantic_cache(agent)
+        cached_result = cache.get(query, query_vec=query_vec)
+        if cached_result is not None:
+            print(f"Semantic cache hit for {agent}")
+            return cached_result
+
+        retrieved_docs = agent_obj.retrieve(query, k=3, query_vec=query_vec)
+
+        print(f"\nRetrieved {len(retrieved_docs)} chunks for {agent}:")
+        chunks_data = [
+            {"chunk_id": i, "content": doc.page_content, "metadata": doc.metadata}
+            for i, doc in enumerate(retrieved_docs, 1)
+        ]
+        if os.getenv("AGENT_DEBUG"):
+            for i, doc in enumerate(retrieved_docs, 1):
+                print(f"  Chunk {i}: {doc.page_content[:100]}...")
+        print()
+
+        llm = _get_llm(model_name, 0, 130)
+
+        prompt = _AGENT_PROMPT
+
+        # Join the retrieved chunks once; the map just forwards the string
+        context_str = "\n\n".join(doc.page_content for doc in retrieved_docs)
+
+        qa_chain = (
+            RunnableMap(
+                {
+                    "context": lambda x: context_str,
+                    "question": lambda x: x["question"],
+                    "agent_type": lambda x: x["agent_type"],
+                }
+            )
+            | prompt
+            | llm
+        )
+
+        config = {"callbacks": [langfuse_handler]} if langfuse_handler else {}
+        result = await qa_chain.ainvoke(
+            {"question": query, "agent_type": agent.replace("Agent", "")}, config=config
+        )
+
+        qa_result = {
+            "response": result.content,
+            "chunks": chunks_data,
+            "num_chunks": len(chunks_data),
+            "agent": agent,
+            "model": model_name,
+        }
+        cache.put(query, qa_result, query_vec=query_vec)
+        return qa_result
+
+    except Exception as e:
+        print(f"Vector store error for {agent}: {e}")
+        fallback_response = agent_obj.run()
+        return {
+            "response": fallback_response,
+            "chunks": [],
+            "num_chunks": 0,
+            "agent": agent,
+            "model": model_name,
+            "error": str(e),
+        }
+
+
+def _extract_response(result) -> str:
+    """
+    Normalizes a qa-chain result (dict, legacy tuple, or plain string)
+    down to the response text.
+    """
+
+    if isinstance(result, dict):
+        return result.get("response", str(result))
+    if isinstance(result, tuple):
+        return result[0]
+    return result
+
+
 # Create wrapper functions for each agent
 # @observe decorator automatically captures: input, output, latency
 # CallbackHandler (passed to create_agent_qa_chain) automatically captures: tokens, costs, model
 @observe(name="hr_agent", capture_input=True, capture_output=True)
-def hr_agent_func(query: str) -> str:
+def hr_agent_func(query: str, query_vec=None) -> str:
     """Wrapper function for HRAgent"""
     langfuse_handler = CallbackHandler()
-    result = create_agent_qa_chain("HRAgent", query, langfuse_handler)
+    result = create_agent_qa_chain("HRAgent", query, langfuse_handler, query_vec=query_vec)
 
     # Handle dict return (response, chunks_data, metadata)
     if isinstance(result, dict):
@@ -161,10 +320,10 @@ def hr_agent_func(query: str) -> str:
 
 
 @observe(name="tech_agent", capture_input=True, capture_output=True)
-def tech_agent_func(query: str) -> str:
+def tech_agent_func(query: str, query_vec=None) -> str:
     """Wrapper function for TechAgent"""
     langfuse_handler = CallbackHandler()
-    result = create_agent_qa_chain("TechAgent", query, langfuse_handler)
+    result = create_agent_qa_chain("TechAgent", query, langfuse_handler, query_vec=query_vec)
 
     # Handle dict return (response, chunks_data, metadata)
     if isinstance(result, dict):
@@ -176,10 +335,10 @@ def tech_agent_func(query: str) -> str:
 
 
 @observe(name="finance_agent", capture_input=True, capture_output=True)
-def finance_agent_func(query: str) -> str:
+def finance_agent_func(query: str, query_vec=None) -> str:
     """Wrapper function for FinanceAgent"""
     langfuse_handler = CallbackHandler()
-    result = create_agent_qa_chain("FinanceAgent", query, langfuse_handler)
+    result = create_agent_qa_chain("FinanceAgent", query, langfuse_handler, query_vec=query_vec)
 
     # Handle dict return (response, chunks_data, metadata)
     if isinstance(result, dict):
@@ -190,25 +349,145 @@ def finance_agent_func(query: str) -> str:
     return result
 
 
+@observe(name="hr_agent", capture_input=True, capture_output=True)
+async def ahr_agent_func(query: str, query_vec=None) -> str:
+    """Async wrapper function for HRAgent"""
+    langfuse_handler = CallbackHandler()
+    result = await acreate_agent_qa_chain("HRAgent", query, langfuse_handler, query_vec=query_vec)
+    return _extract_response(result)
+
+
+@observe(name="tech_agent", capture_input=True, capture_output=True)
+async def atech_agent_func(query: str, query_vec=None) -> str:
+    """Async wrapper function for TechAgent"""
+    langfuse_handler = CallbackHandler()
+    result = await acreate_agent_qa_chain("TechAgent", query, langfuse_handler, query_vec=query_vec)
+    return _extract_response(result)
+
+
+@observe(name="finance_agent", capture_input=True, capture_output=True)
+async def afinance_agent_func(query: str, query_vec=None) -> str:
+    """Async wrapper function for FinanceAgent"""
+    langfuse_handler = CallbackHandler()
+    result = await acreate_agent_qa_chain("FinanceAgent", query, langfuse_handler, query_vec=query_vec)
+    return _extract_response(result)
+
+
 tools = [
     Tool(
         name="HRAgent",
         func=hr_agent_func,
+        coroutine=ahr_agent_func,
         description="Answers questions related to Human Resources (policies, benefits, etc).",
     ),
     Tool(
         name="TechAgent",
         func=tech_agent_func,
+        coroutine=atech_agent_func,
         description="Answers Technical Support questions (IT issues, software, etc).",
     ),
     Tool(
         name="FinanceAgent",
         func=finance_agent_func,
+        coroutine=afinance_agent_func,
         description="Answers questions related to Finance (budget, expenses, etc).",
     ),
 ]
 
 
+# System prompt for the LLM router, derived once at import time
+_SYSTEM_PROMPT = _ORCHESTRATOR_PROMPT_TEXT.replace("User query: {query}", "").strip()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_agent_graph():
+    """
+    Builds the LLM-router LangGraph once. Graph compilation (StateGraph
+    construction plus validation) is identical for every query, so it is
+    paid a single time per process.
+    """
+
+    return create_agent(
+        model=_get_llm(model_name, 0), tools=tools, system_prompt=_SYSTEM_PROMPT
+    )
+
+
+# Prototype queries per agent for the local centroid router. Routing a
+# query is then one embedding pass plus a dot product against 3 centroids
+# instead of an LLM round-trip.
+_PROTOTYPE_QUERIES = {
+    "HRAgent": [
+        "How do I apply for parental leave?",
+        "What is the company's vacation policy?",
+        "How do I enroll in health benefits?",
+        "When is payday and how do I view my payslip?",
+        "What is the remote work policy?",
+        "How do I report a workplace harassment issue?",
+        "How many sick days do I get per year?",
+        "How do I update my emergency contact information?",
+    ],
+    "TechAgent": [
+        "My laptop won't turn on",
+        "I can't access the VPN",
+        "How do I reset my password?",
+        "The office wifi keeps disconnecting",
+        "How do I install the approved software?",
+        "My computer is running very slow",
+        "I need access to the shared drive",
+        "My email client keeps crashing",
+    ],
+    "FinanceAgent": [
+        "How do I submit an expense report?",
+        "What is the budget approval process?",
+        "How do I get reimbursed for travel costs?",
+        "Who approves purchase orders?",
+        "When are invoices paid out?",
+        "What is the corporate card spending limit?",
+        "How do I request a new budget line?",
+        "Where can I find the quarterly financial report?",
+    ],
+}
+
+# Minimum cosine-score lead of the best agent over the runner-up before
+# the centroid router is trusted; closer than this falls back to the LLM
+ROUTING_MARGIN = 0.05
+
+
+@functools.lru_cache(maxsize=1)
+def _get_route_centroids():
+    """
+    Embeds the prototype queries once and returns (agent_names, centroids)
+    with the centroids L2-normalized.
+    """
+
+    embeddings = _get_embeddings(os.getenv("EMBEDDING_MODEL"))
+    names = list(_PROTOTYPE_QUERIES)
+    centroids = []
+    for name in names:
+        vecs = np.asarray(
+            embeddings.embed_documents(_PROTOTYPE_QUERIES[name]), dtype=np.float32
+        )
+        vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+        centroid = vecs.mean(axis=0)
+        centroid /= np.linalg.norm(centroid)
+        centroids.append(centroid)
+    return names, np.stack(centroids)
+
+
+# Direct dispatch tables for the centroid router
+_agent_funcs = {
+    "HRAgent": hr_agent_func,
+    "TechAgent": tech_agent_func,
+    "FinanceAgent": finance_agent_func,
+}
+
+_async_agent_funcs = {
+    "HRAgent": ahr_agent_func,
+    "TechAgent": atech_agent_func,
+    "FinanceAgent": afinance_agent_func,
+}
+
+
 class Orchestrator:
     """
     Orchestrator class that classifies user queries into agent categories.
@@ -216,7 +495,8 @@ class Orchestrator:
 
     def __init__(self):
         self.query = None
-        self.prompt_text = open("prompts/orchestrator_prompt.txt", "r").read()
+        self.query_vec = None
+        self.system_prompt = _SYSTEM_PROMPT
         self.model_string = f"openai:{model_name}"
 
         print(f"Orchestrator is initializing...")
@@ -227,7 +507,38 @@ class Orchestrator:
         """
 
         self.query = query
-        self.system_prompt = self.prompt_text.replace("User query: {query}", "").strip()
+
+    def _embed_query(self):
+        """
+        Embeds the current query exactly once and stashes the vector so the
+        router, semantic cache and retrieval all share it.
+        """
+
+        self.query_vec = _embed_query_vec(self.query)
+        return self.query_vec
+
+    def classify(self, query: str, query_vec=None):
+        """
+        Classifies a query to an agent name via cosine similarity against
+        the prototype centroids. Returns None when the top two scores are
+        too close to call (the caller should fall back to the LLM router).
+        """
+
+        names, centroids = _get_route_centroids()
+        if query_vec is None:
+            query_vec = _embed_query_vec(query)
+
+        # Normalize a local copy; the shared vector stays raw for the
+        # L2-metric FAISS retrieval path
+        norm = np.linalg.norm(query_vec)
+        if norm > 0:
+            query_vec = query_vec / norm
+
+        scores = centroids @ query_vec
+        order = np.argsort(scores)[::-1]
+        if scores[order[0]] - scores[order[1]] < ROUTING_MARGIN:
+            return None
+        return names[order[0]]
 
     @observe(name="orchestrator", capture_input=True, capture_output=True)
     def run(self) -> str:
@@ -238,40 +549,82 @@ class Orchestrator:
             str: The agent's response to the query.
         """
 
-        # Create LangFuse callback handler for the orchestrator
-        # CallbackHandler automatically tracks: tokens, costs, latency, model, input, output
-        langfuse_handler = CallbackHandler()
+        # Embed once, then route with the local centroid classifier: an
+        # unambiguous query goes straight to its agent with no LLM
+        # routing round-trip, reusing the same vector for cache/retrieval
+        query_vec = self._embed_query()
+        chosen_agent = self.classify(self.query, query_vec=query_vec)
+        if chosen_agent is not None:
+            print(f"Routing to {chosen_agent} (centroid classifier)")
+            response = _agent_funcs[chosen_agent](self.query, query_vec=query_vec)
+        else:
+            # Ambiguous scores: fall back to the LLM-based tool router
+            # CallbackHandler automatically tracks: tokens, costs, latency, model, input, output
+            langfuse_handler = CallbackHandler()
+
+            # Reuse the router graph compiled once at first use; the
+            # handler passed at invoke time tracks tokens, costs and latency
+            agent_graph = _get_agent_graph()
+
+            # Invoke the agent with messages and callback
+            # CallbackHandler will track all LLM calls within the agent execution
+            result = agent_graph.invoke(
+                {"messages": [HumanMessage(content=self.query)]},
+                config={"callbacks": [langfuse_handler]},
+            )
 
-        model = ChatOpenAI(
-            model=model_name,
-            temperature=0,
-            callbacks=[
-                langfuse_handler
-            ],  # Automatically tracks tokens, costs, latency, model
-        )
+            # Extract the last AI message content from the result
+            if result.get("messages"):
+                last_message = result["messages"][-1]
+                response = (
+                    last_message.content
+                    if hasattr(last_message, "content")
+                    else str(last_message)
+                )
+            else:
+                response = str(result)
 
-        # Create the agent with tools for routing
-        agent_graph = create_agent(
-            model=model, tools=tools, system_prompt=self.system_prompt
-        )
+        # Automatically evaluate the response
+        self._evaluate_response(response)
 
-        # Invoke the agent with messages and callback
-        # CallbackHandler will track all LLM calls within the agent execution
-        result = agent_graph.invoke(
-            {"messages": [HumanMessage(content=self.query)]},
-            config={"callbacks": [langfuse_handler]},
-        )
+        return response
+
+    @observe(name="orchestrator", capture_input=True, capture_output=True)
+    async def arun(self) -> str:
+        """
+        Async variant of run that streams LLM-router tokens to stdout as
+        they arrive, so the REPL shows output at time-to-first-token
+        instead of blocking on the full completion.
+
+        Returns:
+            str: The agent's response to the query.
+        """
 
-        # Extract the last AI message content from the result
-        if result.get("messages"):
-            last_message = result["messages"][-1]
-            response = (
-                last_message.content
-                if hasattr(last_message, "content")
-                else str(last_message)
+        query_vec = self._embed_query()
+        chosen_agent = self.classify(self.query, query_vec=query_vec)
+        if chosen_agent is not None:
+            print(f"Routing to {chosen_agent} (centroid classifier)")
+            response = await _async_agent_funcs[chosen_agent](
+                self.query, query_vec=query_vec
             )
         else:
-            response = str(result)
+            langfuse_handler = CallbackHandler()
+            agent_graph = _get_agent_graph()
+
+            pieces = []
+            async for event in agent_graph.astream_events(
+                {"messages": [HumanMessage(content=self.query)]},
+                config={"callbacks": [langfuse_handler]},
+                version="v2",
+            ):
+                if event["event"] == "on_chat_model_stream":
+                    chunk = event["data"]["chunk"].content
+                    if chunk:
+                        sys.stdout.write(chunk)
+                        sys.stdout.flush()
+                        pieces.append(chunk)
+            sys.stdout.write("\n")
+            response = "".join(pieces)
 
         # Automatically evaluate the response
         self._evaluate_response(response)
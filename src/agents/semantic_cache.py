@@ -0,0 +1,155 @@
+"""
+Semantic response cache for agent QA chains.
+"""
+
+import atexit
+import os
+import pickle
+import re
+import threading
+
+import faiss
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Caches LLM responses keyed by query embedding so near-duplicate queries
+    are answered from the cache instead of a new API round-trip.
+
+    Each agent gets its own cache so answers never leak between domains.
+
+    get/put are thread-safe; agent chains run on up to 10 concurrent
+    workers and faiss releases the GIL, so unguarded index.add/append
+    pairs could misalign FAISS ids with the responses list.
+    """
+
+    # Persist after this many puts rather than on every insert, so the
+    # hot path is not O(n) disk I/O per response
+    PERSIST_EVERY = 32
+
+    def __init__(
+        self,
+        agent: str,
+        embeddings,
+        similarity_threshold: float = 0.85,
+        max_cache_size: int = 1000,
+        cache_dir: str = "storage/cache",
+    ):
+        self.agent = agent
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.max_cache_size = max_cache_size
+
+        # Key the persisted files by embedding model so switching
+        # EMBEDDING_MODEL never loads vectors of the wrong dimension
+        model_id = (
+            getattr(embeddings, "model_name", None)
+            or getattr(embeddings, "model", None)
+            or "default"
+        )
+        model_slug = re.sub(r"[^A-Za-z0-9._-]+", "-", str(model_id))
+        stem = f"{agent.lower()}_{model_slug}_llmcache"
+        self.index_path = os.path.join(cache_dir, f"{stem}.faiss")
+        self.responses_path = os.path.join(cache_dir, f"{stem}.pkl")
+
+        if os.path.exists(self.index_path) and os.path.exists(self.responses_path):
+            self.index = faiss.read_index(self.index_path)
+            with open(self.responses_path, "rb") as f:
+                self.responses = pickle.load(f)
+        else:
+            self.index = None
+            self.responses = []
+
+        self._lock = threading.Lock()
+        self._dirty_puts = 0
+        atexit.register(self.flush)
+
+    def _embed(self, query: str, query_vec=None) -> np.ndarray:
+        """
+        Embeds the query (or reuses a precomputed vector) and L2-normalizes
+        it so inner product equals cosine.
+        """
+
+        if query_vec is None:
+            vec = np.array(self.embeddings.embed_query(query), dtype=np.float32)
+        else:
+            vec = np.array(query_vec, dtype=np.float32)
+        vec = vec.reshape(1, -1)
+        faiss.normalize_L2(vec)
+        return vec
+
+    def get(self, query: str, query_vec=None):
+        """
+        Returns the cached response for a semantically similar query,
+        or None on a cache miss.
+        """
+
+        vec = self._embed(query, query_vec)
+
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return None
+            scores, ids = self.index.search(vec, 1)
+            if scores[0][0] >= self.similarity_threshold:
+                return self.responses[ids[0][0]]
+        return None
+
+    def put(self, query: str, response, query_vec=None):
+        """
+        Stores a response under the query's embedding. The cache is
+        persisted every PERSIST_EVERY puts and at process exit.
+        """
+
+        vec = self._embed(query, query_vec)
+
+        with self._lock:
+            if self.index is None:
+                self.index = faiss.IndexFlatIP(vec.shape[1])
+            elif len(self.responses) >= self.max_cache_size:
+                self._evict_oldest_locked()
+            self.index.add(vec)
+            self.responses.append(response)
+
+            self._dirty_puts += 1
+            if self._dirty_puts >= self.PERSIST_EVERY:
+                self._persist_locked()
+
+    def _evict_oldest_locked(self):
+        """
+        Drops the oldest entry (FIFO) to make room. Caller holds
+        self._lock. IndexFlat ids are positional, so the index is rebuilt
+        from the remaining vectors to keep ids aligned with responses.
+        """
+
+        vecs = self.index.reconstruct_n(0, self.index.ntotal)
+        self.index.reset()
+        self.index.add(vecs[1:])
+        self.responses.pop(0)
+
+    def flush(self):
+        """Persists any unwritten entries; called automatically at exit."""
+
+        with self._lock:
+            if self._dirty_puts:
+                self._persist_locked()
+
+    def _persist_locked(self):
+        """
+        Writes the index and responses to disk. Caller holds self._lock.
+        Both files go through a temp-file + rename so a crash or a
+        concurrent reader never sees a half-written cache.
+        """
+
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+
+        tmp_index = f"{self.index_path}.tmp"
+        faiss.write_index(self.index, tmp_index)
+        os.replace(tmp_index, self.index_path)
+
+        tmp_responses = f"{self.responses_path}.tmp"
+        with open(tmp_responses, "wb") as f:
+            pickle.dump(self.responses, f)
+        os.replace(tmp_responses, self.responses_path)
+
+        self._dirty_puts = 0
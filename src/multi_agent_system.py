@@ -2,6 +2,8 @@
 Multi-agent system to classify and route user queries to appropriate agents.
 """
 
+import asyncio
+
 from dotenv import load_dotenv
 from langfuse import Langfuse
 
@@ -10,21 +12,30 @@ from agents.orchestrator import Orchestrator
 load_dotenv()
 
 
-def main():
+async def main():
     """
     Main function to run the orchestrator with automatic evaluation.
+
+    The whole REPL runs on one event loop: the cached async OpenAI client
+    pools keep-alive connections bound to the loop it first ran on, so an
+    asyncio.run per iteration would close that loop and make the next
+    query fail on a pooled connection.
     """
 
     orchestrator = Orchestrator()
 
     while True:
+        # Blocking input is fine here; nothing else runs on the loop
+        # between queries
         query = input("What would you like to know?: ")
         orchestrator.set_query(query)
 
         if query.lower() in ["exit", "quit", "q"]:
             break
 
-        response = orchestrator.run()
+        # arun streams router tokens as they arrive instead of blocking
+        # on the full completion
+        response = await orchestrator.arun()
         print(f"\n{'='*60}")
         print("FINAL RESPONSE")
         print(f"{'='*60}")
@@ -37,4 +48,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,17 @@
+"""
+Shared Langfuse client for the test and validation scripts.
+"""
+
+from dotenv import load_dotenv
+from langfuse import Langfuse
+
+load_dotenv()
+
+# One client per process so repeated trace/flush calls reuse the same
+# TCP/TLS connections instead of paying a fresh handshake each time
+_LF = Langfuse()
+
+
+def get_langfuse():
+    """Returns the shared Langfuse client."""
+    return _LF
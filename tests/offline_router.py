@@ -0,0 +1,75 @@
+"""
+Offline routing evaluation for CI.
+
+Scores routing accuracy over the full golden set with a single batched
+embedding forward pass against the orchestrator's prototype centroids —
+no LLM calls, no retrieval — so it is cheap enough to run on every PR.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def predict_agents(queries):
+    """
+    Batch-classifies queries against the prototype centroids.
+
+    All queries are embedded in one forward pass, then scored with a
+    single (N x d) @ (d x agents) matmul. Entries whose top two scores
+    are within the routing margin come back as None, mirroring
+    Orchestrator.classify.
+
+    Returns:
+        list: predicted agent name (or None) per query, in input order
+    """
+    import os
+
+    from src.agents.agent import _get_embeddings
+    from src.agents.orchestrator import ROUTING_MARGIN, _get_route_centroids
+
+    embeddings = _get_embeddings(os.getenv("EMBEDDING_MODEL"))
+    vecs = np.asarray(embeddings.embed_documents(list(queries)), dtype=np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+
+    names, centroids = _get_route_centroids()
+    scores = vecs @ centroids.T
+
+    # Partial sort: only the top two scores per row matter for the margin
+    top2 = np.argpartition(scores, -2, axis=1)[:, -2:]
+    top2_scores = np.take_along_axis(scores, top2, axis=1)
+
+    predictions = []
+    for row, row_scores in zip(top2, top2_scores):
+        if abs(row_scores[1] - row_scores[0]) < ROUTING_MARGIN:
+            predictions.append(None)
+        else:
+            best = row[1] if row_scores[1] >= row_scores[0] else row[0]
+            predictions.append(names[best])
+    return predictions
+
+
+def evaluate_offline_routing(golden_data=None, verbose=True):
+    """
+    Evaluates routing accuracy over the golden set without the LLM tree.
+
+    Returns:
+        dict: accuracy metrics matching validate_routing's shape
+    """
+    from tests.validate_system import load_golden_data, validate_routing
+
+    if golden_data is None:
+        golden_data = load_golden_data()
+
+    return validate_routing(golden_data, verbose=verbose, mode="offline")
+
+
+if __name__ == "__main__":
+    results = evaluate_offline_routing()
+    sys.exit(0 if results["accuracy"] >= 85 else 1)